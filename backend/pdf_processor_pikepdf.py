@@ -15,7 +15,7 @@ Key Features:
 
 Technical Approach:
     The processor works by:
-    1. Adding a dark background layer underneath existing content
+    1. Drawing a dark background rectangle before any existing content
     2. Using regex to find color operators in PDF content streams
     3. Transforming colors based on brightness and saturation
     4. Preserving hue for colored elements while brightening them for visibility
@@ -33,29 +33,55 @@ Supported Color Spaces:
 
 Dependencies:
     - pikepdf: PDF manipulation library
-    - reportlab: Background layer generation
     - re: Pattern matching for color operators
     - typing: Type hints
 
 Usage:
     processor = PDFVectorProcessorPikePDF(theme="classic")
-    with open("input.pdf", "rb") as f:
-        input_bytes = f.read()
-    output_bytes = processor.process_pdf(input_bytes)
-    with open("output.pdf", "wb") as f:
-        f.write(output_bytes)
+    processor.process_pdf("input.pdf", output_path="output.pdf")
+
+    # Or keep the result in memory
+    output_bytes = processor.process_pdf("input.pdf")
 
 Author: PDF Dark Mode Converter Project
 License: MIT
 """
 
 import pikepdf
-from pikepdf import Pdf, Name, Array, Operator, Rectangle
+from pikepdf import Pdf, Name
 import io
+import os
 import re
-from typing import Tuple, List
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
+import tempfile
+from typing import Tuple, Union, BinaryIO, Optional
+
+
+# Single pattern matching every color operator, compiled once at import.
+# The alternation lets one pass over the content stream find RGB, grayscale
+# and CMYK operators instead of scanning the whole stream once per operator.
+# It works on raw bytes, so content streams never need decoding.
+# Numbers match: integers, decimals, and decimals without leading zero.
+_COLOR_OP_RE = re.compile(
+    rb'(?P<rgb>(?P<r>\d*\.?\d+)\s+(?P<g>\d*\.?\d+)\s+(?P<b>\d*\.?\d+)\s+(?P<rgb_op>rg|RG))'
+    rb'|(?P<gray>(?P<gray_value>\d+\.?\d*)\s+(?P<gray_op>[gG])\b)'
+    rb'|(?P<cmyk>(?P<c>\d+\.?\d*)\s+(?P<m>\d+\.?\d*)\s+(?P<y>\d+\.?\d*)\s+(?P<k>\d+\.?\d*)'
+    rb'\s+(?P<cmyk_op>[kK])\b)'
+)
+
+# PDF files start with this marker. Readers accept junk before it as long as
+# it appears within the first 1024 bytes, so the check is equally lenient.
+_PDF_HEADER = b"%PDF-"
+_PDF_HEADER_SEARCH_BYTES = 1024
+
+# Theme background colors (RGB 0-255), built once and shared by all processors
+THEMES = {
+    "classic": {"r": 0, "g": 0, "b": 0},
+    "claude": {"r": 42, "g": 37, "b": 34},
+    "chatgpt": {"r": 52, "g": 53, "b": 65},
+    "sepia": {"r": 40, "g": 35, "b": 25},
+    "midnight": {"r": 25, "g": 30, "b": 45},
+    "forest": {"r": 25, "g": 35, "b": 30}
+}
 
 
 class PDFVectorProcessorPikePDF:
@@ -73,7 +99,8 @@ class PDFVectorProcessorPikePDF:
 
     Attributes:
         theme (str): Selected theme name (e.g., "classic", "claude", "chatgpt")
-        themes (dict): Dictionary of available themes with RGB values (0-255)
+        themes (dict): Dictionary of available themes with RGB values (0-255),
+            shared with the module-level THEMES constant (treat as read-only)
         bg_color (dict): Current theme's background color {"r": int, "g": int, "b": int}
         pdf (Pdf): The pikepdf.Pdf object being processed
 
@@ -110,122 +137,255 @@ class PDFVectorProcessorPikePDF:
             KeyError: If an invalid theme name is provided (falls back to "classic")
         """
         self.theme = theme
-        self.themes = {
-            "classic": {"r": 0, "g": 0, "b": 0},
-            "claude": {"r": 42, "g": 37, "b": 34},
-            "chatgpt": {"r": 52, "g": 53, "b": 65},
-            "sepia": {"r": 40, "g": 35, "b": 25},
-            "midnight": {"r": 25, "g": 30, "b": 45},
-            "forest": {"r": 25, "g": 35, "b": 30}
-        }
+        self.themes = THEMES
         self.bg_color = self.themes.get(theme, self.themes["classic"])
 
-    def process_pdf(self, input_bytes: bytes) -> bytes:
+        # Background color normalized to 0-1, computed once instead of per color
+        self._bg_rgb = (
+            self.bg_color["r"] / 255.0,
+            self.bg_color["g"] / 255.0,
+            self.bg_color["b"] / 255.0
+        )
+        self._bg_gray = (0.299 * self.bg_color["r"] +
+                         0.587 * self.bg_color["g"] +
+                         0.114 * self.bg_color["b"]) / 255.0
+        self._bg_fill_op = b"%.4f %.4f %.4f rg" % self._bg_rgb
+
+        # Background operators keyed by MediaBox; most documents use one page size
+        self._bg_content_cache = {}
+
+        # Transformed colors keyed by input (r, g, b), and finished operator
+        # replacements keyed by the exact matched bytes; cleared per document
+        self._color_cache = {}
+        self._replacement_cache = {}
+
+    def process_pdf(self, input_pdf: Union[bytes, str, os.PathLike, BinaryIO],
+                    output_path: Optional[Union[str, os.PathLike]] = None) -> Union[bytes, str, os.PathLike]:
         """
         Process a PDF and convert it to dark mode.
 
-        Main entry point for PDF conversion. Opens the PDF from bytes, processes
-        each page by adding dark backgrounds and transforming colors, then returns
-        the modified PDF as bytes.
+        Main entry point for PDF conversion. Opens the PDF from bytes, a file path,
+        or a binary file object, processes each page by adding dark backgrounds and
+        transforming colors, then returns the modified PDF as bytes or, when an
+        output path is given, writes it straight to disk.
+
+        Passing a file path (preferred) or an open file object lets pikepdf read
+        the document directly from the file instead of first copying the whole PDF
+        into a bytes object. File paths are memory-mapped, so the OS pages the
+        document in on demand rather than reading it all upfront.
 
         Processing steps:
-        1. Opens PDF from input bytes using pikepdf
+        1. Opens PDF from input bytes, path, or file object using pikepdf
         2. Iterates through all pages
         3. For each page:
-           - Creates a dark background matching page dimensions
-           - Adds background as underlay (beneath existing content)
            - Transforms color operators in content streams
-        4. Saves modified PDF to bytes and returns
+           - Prepends a dark background rectangle matching page dimensions
+        4. Saves modified PDF to output_path (via a temporary file in the same
+           folder, so a failed save never leaves a partial output behind) or
+           to bytes, and returns
 
         Args:
-            input_bytes (bytes): Raw bytes of the input PDF file
+            input_pdf (bytes | str | os.PathLike | BinaryIO): Raw bytes of the
+                input PDF file, a path to it, or a seekable binary file object
+                opened for reading. File objects must stay open until this
+                method returns.
+            output_path (str | os.PathLike, optional): Where to write the
+                processed PDF. When given, pikepdf streams the output to disk
+                and the document is never held in memory as bytes.
 
         Returns:
-            bytes: Raw bytes of the processed PDF with dark mode applied
+            bytes | str | os.PathLike: Raw bytes of the processed PDF with dark
+                mode applied, or output_path if one was given
 
         Raises:
-            pikepdf.PdfError: If the input bytes are not a valid PDF
+            ValueError: If the input has no %PDF- header (rejected before pikepdf
+                        spends any time trying to parse or repair it)
+            pikepdf.PdfError: If the input is not a valid PDF
             Exception: Any errors during processing are caught and logged per-page,
                       allowing the rest of the document to process
 
         Example:
             >>> processor = PDFVectorProcessorPikePDF(theme="classic")
-            >>> with open("input.pdf", "rb") as f:
-            ...     pdf_bytes = f.read()
-            >>> output_bytes = processor.process_pdf(pdf_bytes)
-            >>> with open("output.pdf", "wb") as f:
-            ...     f.write(output_bytes)
+            >>> processor.process_pdf("input.pdf", output_path="output.pdf")
+            'output.pdf'
         """
-        # Open PDF
-        self.pdf = Pdf.open(io.BytesIO(input_bytes))
+        self._check_pdf_header(input_pdf)
+        self._color_cache.clear()
+        self._replacement_cache.clear()
+
+        # Open PDF (paths are memory-mapped, file objects are read in place,
+        # bytes are wrapped)
+        if isinstance(input_pdf, (bytes, bytearray)):
+            self.pdf = Pdf.open(io.BytesIO(input_pdf))
+        elif isinstance(input_pdf, (str, os.PathLike)):
+            self.pdf = Pdf.open(input_pdf, access_mode=pikepdf.AccessMode.mmap)
+        else:
+            self.pdf = Pdf.open(input_pdf)
 
-        # Process each page (create background per page for correct dimensions)
-        for page in self.pdf.pages:
-            self._process_page(page)
+        try:
+            # Process each page (create background per page for correct dimensions)
+            for page in self.pdf.pages:
+                self._process_page(page)
 
-        # Save to bytes
-        output = io.BytesIO()
-        self.pdf.save(output)
-        output.seek(0)
+            if output_path is not None:
+                self._save_to_path(output_path)
+                return output_path
 
-        result = output.getvalue()
-        self.pdf.close()
+            # Save to bytes
+            output = io.BytesIO()
+            self._save(output)
+            return output.getvalue()
 
-        return result
+        finally:
+            self.pdf.close()
 
-    def _create_background_pdf(self, width, height) -> Pdf:
+    def _check_pdf_header(self, input_pdf):
         """
-        Create a single-page PDF containing only a dark background rectangle.
+        Reject input that does not start like a PDF before opening it.
 
-        Uses reportlab to generate a temporary PDF with a filled rectangle matching
-        the specified dimensions and the current theme's background color. This PDF
-        is then opened with pikepdf and used as an underlay for the original pages.
+        Reads at most the first 1024 bytes and looks for the %PDF- marker.
+        Without this check, non-PDF files (HTML error pages, images renamed to
+        .pdf) go through pikepdf's full parse and repair attempt before failing
+        with an opaque error. File objects are rewound to where they started.
 
         Args:
-            width (float): Width of the background rectangle in PDF units (points)
-            height (float): Height of the background rectangle in PDF units (points)
+            input_pdf (bytes | str | os.PathLike | BinaryIO): Input as accepted
+                by process_pdf()
 
-        Returns:
-            Pdf: A pikepdf.Pdf object containing a single page with a solid dark background
+        Raises:
+            ValueError: If the %PDF- marker is not found
+        """
+        if isinstance(input_pdf, (bytes, bytearray)):
+            head = bytes(input_pdf[:_PDF_HEADER_SEARCH_BYTES])
+        elif isinstance(input_pdf, (str, os.PathLike)):
+            with open(input_pdf, 'rb') as f:
+                head = f.read(_PDF_HEADER_SEARCH_BYTES)
+        else:
+            position = input_pdf.tell()
+            head = input_pdf.read(_PDF_HEADER_SEARCH_BYTES)
+            input_pdf.seek(position)
 
-        Note:
-            The background color is determined by self.bg_color which is set based on
-            the selected theme. Colors are normalized from 0-255 range to 0-1 range
-            for reportlab compatibility.
+        if _PDF_HEADER not in head:
+            raise ValueError("Not a valid PDF (missing %PDF- header)")
+
+    def _save(self, target):
+        """
+        Write the processed PDF with a minimal rewrite of untouched objects.
+
+        Only page content streams are replaced during conversion. Saving with
+        stream decoding disabled copies every other stream (images, fonts,
+        embedded files) through byte-for-byte instead of decoding and
+        re-encoding it, and existing object streams are kept as they are.
+        New content streams are still compressed.
+
+        Args:
+            target (str | BinaryIO): Output file path or writable binary stream
+        """
+        self.pdf.save(
+            target,
+            object_stream_mode=pikepdf.ObjectStreamMode.preserve,
+            stream_decode_level=pikepdf.StreamDecodeLevel.none,
+            compress_streams=True
+        )
+
+    def _save_to_path(self, output_path):
+        """
+        Save the processed PDF to a file without holding it in memory.
+
+        pikepdf writes to a temporary file in the destination folder, which is
+        then renamed over output_path. The rename is atomic on the same file
+        system, so an interrupted save never leaves a truncated PDF whose fresh
+        modification time would make it look up to date.
+
+        mkstemp() creates the temporary file readable by its owner only, so
+        before the rename it gets the permissions a plain open() would have
+        produced: those of the file being replaced, or the default file mode
+        under the current umask for a new file.
+
+        Args:
+            output_path (str | os.PathLike): Destination path of the processed PDF
+        """
+        output_dir = os.path.dirname(os.path.abspath(output_path))
+        fd, temp_path = tempfile.mkstemp(suffix=".pdf", dir=output_dir)
+        os.close(fd)
+
+        try:
+            self._save(temp_path)
+            os.chmod(temp_path, self._output_file_mode(output_path))
+            os.replace(temp_path, output_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _output_file_mode(self, output_path) -> int:
+        """
+        Get the permission bits a directly written output file would have.
+
+        Args:
+            output_path (str | os.PathLike): Destination path of the processed PDF
+
+        Returns:
+            int: Mode of the existing output file, or 0o666 masked by the
+                 process umask if the file does not exist yet (e.g. 0o644
+                 with umask 022)
         """
-        packet = io.BytesIO()
-        # Use the exact page dimensions
-        can = canvas.Canvas(packet, pagesize=(width, height))
+        try:
+            return os.stat(output_path).st_mode & 0o7777
+        except FileNotFoundError:
+            # The umask can only be read by setting it, so restore it at once
+            umask = os.umask(0)
+            os.umask(umask)
+            return 0o666 & ~umask
+
+    def _background_content(self, mediabox) -> bytes:
+        """
+        Build the content stream operators that paint the dark page background.
 
-        # Set fill color to theme color
-        bg_r = self.bg_color["r"] / 255.0
-        bg_g = self.bg_color["g"] / 255.0
-        bg_b = self.bg_color["b"] / 255.0
+        The background is a single filled rectangle covering the MediaBox,
+        wrapped in q/Q so its fill color does not leak into the page content
+        that follows it. Prepending these few bytes to the page's own content
+        replaces building a separate background PDF and grafting it onto every
+        page as an underlay. The result is cached per MediaBox, so same-size
+        pages reuse the same bytes.
+
+        Args:
+            mediabox (pikepdf.Array): The page's MediaBox [x0, y0, x1, y1]
 
-        can.setFillColorRGB(bg_r, bg_g, bg_b)
-        can.rect(0, 0, width, height, fill=True, stroke=False)
-        can.save()
+        Returns:
+            bytes: Content stream operators, e.g.
+                   b"q 0.0000 0.0000 0.0000 rg 0.0000 0.0000 612.0000 792.0000 re f Q\n"
 
-        packet.seek(0)
-        return Pdf.open(packet)
+        Note:
+            The background color is determined by self.bg_color which is set based on
+            the selected theme (normalized to the 0-1 range in __init__).
+        """
+        x0, y0, x1, y1 = (float(v) for v in mediabox)
+
+        key = (x0, y0, x1, y1)
+        content = self._bg_content_cache.get(key)
+        if content is None:
+            content = b"q %s %.4f %.4f %.4f %.4f re f Q\n" % (
+                self._bg_fill_op, x0, y0, x1 - x0, y1 - y0)
+            self._bg_content_cache[key] = content
+        return content
 
     def _process_page(self, page):
         """
         Process a single PDF page by adding background and transforming colors.
 
         This method performs the core page-level transformation:
-        1. Extracts page dimensions from MediaBox
-        2. Creates a dark background PDF matching those dimensions
-        3. Adds the background as an underlay (beneath all existing content)
-        4. Reads the page's content stream(s)
-        5. Transforms color operators in the content stream
-        6. Replaces the content stream with the modified version
+        1. Builds dark background operators matching the page's MediaBox
+        2. Reads the page's content stream(s)
+        3. Transforms color operators in the content stream
+        4. Replaces the content stream with the background operators followed
+           by the modified content (so the background is painted first)
 
         Content Stream Handling:
             - Handles both single content streams and arrays of content streams
-            - Combines multiple streams into a single transformed stream
-            - Decodes content using latin-1 encoding with error tolerance
-            - Encodes modified content back to latin-1 for PDF compatibility
+            - Combines multiple streams into a single transformed stream, since
+              PDF allows a stream boundary between an operator and its operands
+            - Works on the raw stream bytes (no decode/encode round-trip)
 
         Args:
             page (pikepdf.Page): The PDF page object to process
@@ -235,29 +395,16 @@ class PDFVectorProcessorPikePDF:
                       propagating them, allowing other pages to be processed
 
         Note:
-            If a page has no Contents key (blank page), it is skipped after adding
-            the background. Debug output is printed for white/light colors and
-            dark colored values being transformed.
+            If a page has no Contents key (blank page), it only receives the
+            background.
         """
         try:
-            # Get page dimensions
-            mediabox = page.MediaBox
-            width = float(mediabox[2] - mediabox[0])
-            height = float(mediabox[3] - mediabox[1])
-
-            # Create a background PDF with the exact page dimensions
-            bg_pdf = self._create_background_pdf(width, height)
-            bg_page = bg_pdf.pages[0]
-
-            # Add dark background as underlay (below all content)
-            bg_rect = Rectangle(0, 0, width, height)
-            page.add_underlay(bg_page, bg_rect)
-
-            # Close the background PDF
-            bg_pdf.close()
+            # Dark background with the exact page dimensions
+            bg_content = self._background_content(page.MediaBox)
 
-            # Now transform the colors in the existing content
+            # Blank page: background only
             if Name.Contents not in page:
+                page.Contents = pikepdf.Stream(self.pdf, bg_content)
                 return
 
             contents = page.Contents
@@ -267,34 +414,30 @@ class PDFVectorProcessorPikePDF:
 
             # Handle array of content streams
             if isinstance(contents, pikepdf.Array):
-                for i, stream in enumerate(contents):
+                for stream in contents:
                     if hasattr(stream, 'read_bytes'):
-                        content_data = stream.read_bytes()
-                        content_str = content_data.decode('latin-1', errors='ignore')
-                        all_content.append(content_str)
+                        all_content.append(stream.read_bytes())
 
             # Handle single content stream
             elif hasattr(contents, 'read_bytes'):
-                content_data = contents.read_bytes()
-                content_str = content_data.decode('latin-1', errors='ignore')
-                all_content.append(content_str)
+                all_content.append(contents.read_bytes())
 
-            # Combine all content
-            combined_content = '\n'.join(all_content)
+            # Combine all content; an operator's operands may sit at the end of
+            # the previous stream, so streams are not transformed separately
+            combined_content = b'\n'.join(all_content)
 
             # Transform the combined content (change text/graphic colors)
             modified_content = self._transform_content_stream(combined_content)
 
-            # Create new stream and replace
-            new_stream = pikepdf.Stream(self.pdf, modified_content.encode('latin-1'))
-            page.Contents = new_stream
+            # Create new stream (background first, below all content) and replace
+            page.Contents = pikepdf.Stream(self.pdf, bg_content + modified_content)
 
         except Exception as e:
             print(f"Warning: Could not process page: {e}")
             import traceback
             traceback.print_exc()
 
-    def _transform_content_stream(self, content: str) -> str:
+    def _transform_content_stream(self, content: bytes) -> bytes:
         """
         Transform all color operators in a PDF content stream using regex.
 
@@ -310,17 +453,18 @@ class PDFVectorProcessorPikePDF:
         - k: CMYK non-stroking color
         - K: CMYK stroking color
 
-        For each operator type, it:
-        1. Finds all occurrences using regex patterns
+        All six operators are found in a single pass with one combined regex.
+        For each match, it:
+        1. Determines the color space from the matched alternative
         2. Extracts the color values
         3. Passes them to the appropriate transformation method
         4. Replaces the original operator with the transformed values
 
         Args:
-            content (str): The raw content stream as a string (decoded from PDF)
+            content (bytes): The raw content stream bytes
 
         Returns:
-            str: Modified content stream with transformed color operators
+            bytes: Modified content stream with transformed color operators
 
         Regex Patterns:
             - Numbers match: integers, decimals, and decimals without leading zero
@@ -328,55 +472,44 @@ class PDFVectorProcessorPikePDF:
             - Whitespace is flexible to handle various PDF formatting styles
 
         Note:
-            The transformations are applied using lambda functions that call
-            the appropriate _replace_* method for each color space.
+            The transformations are applied by _replace_color, which dispatches
+            to the appropriate _replace_* method for each color space.
         """
-        # Use regex to find and replace color operators
+        return _COLOR_OP_RE.sub(self._replace_color, content)
 
-        # RGB non-stroking (rg) - text and fill colors
-        # Match numbers like: 0, 0.5, .5, 1.0
-        content = re.sub(
-            r'(\d*\.?\d+)\s+(\d*\.?\d+)\s+(\d*\.?\d+)\s+rg',
-            lambda m: self._replace_rgb(m, 'rg'),
-            content
-        )
-
-        # RGB stroking (RG) - line colors
-        content = re.sub(
-            r'(\d*\.?\d+)\s+(\d*\.?\d+)\s+(\d*\.?\d+)\s+RG',
-            lambda m: self._replace_rgb(m, 'RG'),
-            content
-        )
+    def _replace_color(self, match):
+        """
+        Dispatch a matched color operator to the replacement for its color space.
 
-        # Grayscale non-stroking (g) - be more careful with the pattern
-        content = re.sub(
-            r'(\d+\.?\d*)\s+g\b',
-            lambda m: self._replace_gray(m, 'g'),
-            content
-        )
+        Callback function for the combined color operator regex. The name of the
+        outer group that matched (rgb, gray or cmyk) selects the replacement.
 
-        # Grayscale stroking (G)
-        content = re.sub(
-            r'(\d+\.?\d*)\s+G\b',
-            lambda m: self._replace_gray(m, 'G'),
-            content
-        )
+        The same operator text (e.g. "0 0 0 rg" for body text) typically appears
+        thousands of times in a document, so finished replacements are cached
+        by the matched bytes and parsing, transforming and formatting only run
+        for operator text not seen before.
 
-        # CMYK non-stroking (k)
-        content = re.sub(
-            r'(\d+\.?\d*)\s+(\d+\.?\d*)\s+(\d+\.?\d*)\s+(\d+\.?\d*)\s+k\b',
-            lambda m: self._replace_cmyk(m, 'k'),
-            content
-        )
+        Args:
+            match (re.Match): Match object from _COLOR_OP_RE
 
-        # CMYK stroking (K)
-        content = re.sub(
-            r'(\d+\.?\d*)\s+(\d+\.?\d*)\s+(\d+\.?\d*)\s+(\d+\.?\d*)\s+K\b',
-            lambda m: self._replace_cmyk(m, 'K'),
-            content
-        )
+        Returns:
+            bytes: Replacement bytes for the matched color operator
+        """
+        key = match.group(0)
+        replacement = self._replacement_cache.get(key)
+        if replacement is not None:
+            return replacement
+
+        kind = match.lastgroup
+        if kind == 'rgb':
+            replacement = self._replace_rgb(match, match.group('rgb_op'))
+        elif kind == 'gray':
+            replacement = self._replace_gray(match, match.group('gray_op'))
+        else:
+            replacement = self._replace_cmyk(match, match.group('cmyk_op'))
 
-        return content
+        self._replacement_cache[key] = replacement
+        return replacement
 
     def _replace_rgb(self, match, operator):
         """
@@ -386,36 +519,25 @@ class PDFVectorProcessorPikePDF:
         regex match, transforms them using _transform_rgb(), and returns the
         formatted replacement string.
 
-        Debug logging is performed for:
-        - White/light colors (brightness > 0.9)
-        - Dark colored values (brightness < 0.2 with color saturation)
-
         Args:
-            match (re.Match): Regex match object containing three capture groups for R, G, B
-            operator (str): The PDF operator ("rg" or "RG")
+            match (re.Match): Regex match object with named groups r, g, b
+            operator (bytes): The PDF operator (b"rg" or b"RG")
 
         Returns:
-            str: Formatted PDF color operator string with transformed values
-                 Format: "{new_r:.4f} {new_g:.4f} {new_b:.4f} {operator}"
+            bytes: Formatted PDF color operator with transformed values
+                   Format: b"{new_r:.4f} {new_g:.4f} {new_b:.4f} {operator}"
 
         Example:
-            Input match: "1.0 1.0 1.0 rg" (white)
-            Output: "0.0000 0.0000 0.0000 rg" (black for classic theme)
+            Input match: b"1.0 1.0 1.0 rg" (white)
+            Output: b"0.0000 0.0000 0.0000 rg" (black for classic theme)
         """
-        r = float(match.group(1))
-        g = float(match.group(2))
-        b = float(match.group(3))
+        r = float(match.group('r'))
+        g = float(match.group('g'))
+        b = float(match.group('b'))
 
         new_r, new_g, new_b = self._transform_rgb(r, g, b)
 
-        # Debug output
-        brightness = 0.299 * r + 0.587 * g + 0.114 * b
-        if brightness > 0.9:  # Log white colors
-            print(f"Transforming white/light RGB: ({r:.2f}, {g:.2f}, {b:.2f}) -> ({new_r:.2f}, {new_g:.2f}, {new_b:.2f})")
-        elif brightness < 0.2 and (g > 0.01 or b > 0.01):  # Log dark colored values
-            print(f"Transforming dark colored RGB: ({r:.2f}, {g:.2f}, {b:.2f}) -> ({new_r:.2f}, {new_g:.2f}, {new_b:.2f})")
-
-        return f"{new_r:.4f} {new_g:.4f} {new_b:.4f} {operator}"
+        return b"%.4f %.4f %.4f %s" % (new_r, new_g, new_b, operator)
 
     def _replace_gray(self, match, operator):
         """
@@ -426,23 +548,23 @@ class PDFVectorProcessorPikePDF:
         returns the formatted replacement string.
 
         Args:
-            match (re.Match): Regex match object containing one capture group for gray value
-            operator (str): The PDF operator ("g" or "G")
+            match (re.Match): Regex match object with named group gray_value
+            operator (bytes): The PDF operator (b"g" or b"G")
 
         Returns:
-            str: Formatted PDF grayscale operator string with transformed value
-                 Format: "{new_gray:.4f} {operator} "
-                 Note the trailing space for PDF formatting compatibility
+            bytes: Formatted PDF grayscale operator with transformed value
+                   Format: b"{new_gray:.4f} {operator} "
+                   Note the trailing space for PDF formatting compatibility
 
         Example:
-            Input match: "0 g" (black)
-            Output: "0.9800 g " (bright white)
+            Input match: b"0 g" (black)
+            Output: b"0.9800 g " (bright white)
         """
-        gray = float(match.group(1))
+        gray = float(match.group('gray_value'))
 
         new_gray = self._transform_grayscale(gray)
 
-        return f"{new_gray:.4f} {operator} "
+        return b"%.4f %s " % (new_gray, operator)
 
     def _replace_cmyk(self, match, operator):
         """
@@ -453,13 +575,13 @@ class PDFVectorProcessorPikePDF:
         formatted replacement string.
 
         Args:
-            match (re.Match): Regex match object containing four capture groups for C, M, Y, K
-            operator (str): The PDF operator ("k" or "K")
+            match (re.Match): Regex match object with named groups c, m, y, k
+            operator (bytes): The PDF operator (b"k" or b"K")
 
         Returns:
-            str: Formatted PDF CMYK operator string with transformed values
-                 Format: "{new_c:.4f} {new_m:.4f} {new_y:.4f} {new_k:.4f} {operator} "
-                 Note the trailing space for PDF formatting compatibility
+            bytes: Formatted PDF CMYK operator with transformed values
+                   Format: b"{new_c:.4f} {new_m:.4f} {new_y:.4f} {new_k:.4f} {operator} "
+                   Note the trailing space for PDF formatting compatibility
 
         Note:
             CMYK values are first converted to RGB, transformed in RGB space,
@@ -467,19 +589,43 @@ class PDFVectorProcessorPikePDF:
             across different color spaces.
 
         Example:
-            Input match: "0 0 0 1 k" (black in CMYK)
-            Output: "0.0000 0.0000 0.0000 0.0200 k " (bright white in CMYK)
+            Input match: b"0 0 0 1 k" (black in CMYK)
+            Output: b"0.0000 0.0000 0.0000 0.0200 k " (bright white in CMYK)
         """
-        c = float(match.group(1))
-        m = float(match.group(2))
-        y = float(match.group(3))
-        k = float(match.group(4))
+        c = float(match.group('c'))
+        m = float(match.group('m'))
+        y = float(match.group('y'))
+        k = float(match.group('k'))
 
         new_c, new_m, new_y, new_k = self._transform_cmyk(c, m, y, k)
 
-        return f"{new_c:.4f} {new_m:.4f} {new_y:.4f} {new_k:.4f} {operator} "
+        return b"%.4f %.4f %.4f %.4f %s " % (new_c, new_m, new_y, new_k, operator)
 
     def _transform_rgb(self, r: float, g: float, b: float) -> Tuple[float, float, float]:
+        """
+        Transform an RGB color for dark mode, reusing earlier results.
+
+        Documents typically use only a handful of distinct colors (body text,
+        page white, a few accents) thousands of times, so results are memoized
+        per document and the HSV math in _compute_rgb_transform() runs once per
+        unique color.
+
+        Args:
+            r (float): Red component (0.0 to 1.0)
+            g (float): Green component (0.0 to 1.0)
+            b (float): Blue component (0.0 to 1.0)
+
+        Returns:
+            Tuple[float, float, float]: Transformed (r, g, b) values, each 0.0-1.0
+        """
+        key = (r, g, b)
+        result = self._color_cache.get(key)
+        if result is None:
+            result = self._compute_rgb_transform(r, g, b)
+            self._color_cache[key] = result
+        return result
+
+    def _compute_rgb_transform(self, r: float, g: float, b: float) -> Tuple[float, float, float]:
         """
         Transform RGB colors intelligently based on brightness and saturation.
 
@@ -520,8 +666,10 @@ class PDFVectorProcessorPikePDF:
             Tuple[float, float, float]: Transformed (r, g, b) values, each 0.0-1.0
 
         Note:
-            Uses HSV color space for transformations to preserve hue while adjusting
-            brightness. The perceived brightness formula (0.299*R + 0.587*G + 0.114*B)
+            Works in HSV terms (value and saturation are adjusted, hue is kept),
+            but applies the change directly to the RGB channels via
+            _adjust_value_saturation() instead of converting to HSV and back.
+            The perceived brightness formula (0.299*R + 0.587*G + 0.114*B)
             weights green more heavily as human eyes are most sensitive to green light.
 
         Example:
@@ -541,14 +689,13 @@ class PDFVectorProcessorPikePDF:
 
         # White/light backgrounds → dark theme color
         if brightness > 0.93:
-            return (
-                self.bg_color["r"] / 255.0,
-                self.bg_color["g"] / 255.0,
-                self.bg_color["b"] / 255.0
-            )
+            return self._bg_rgb
 
-        # Check if it's a colored dark value (has hue/saturation)
-        h, s, v = self._rgb_to_hsv(r, g, b)
+        # Check if it's a colored dark value (has saturation); HSV value is the
+        # largest channel and saturation the channel spread relative to it
+        v = max(r, g, b)
+        diff = v - min(r, g, b)
+        s = 0 if v == 0 else (diff / v)
 
         # Very dark with low saturation (grayscale/black text) → bright white
         if brightness < 0.15 and s < 0.3:
@@ -557,30 +704,64 @@ class PDFVectorProcessorPikePDF:
         # Very dark with saturation (colored like dark blue) → brighten while keeping hue
         if brightness < 0.15:
             # Map dark colored values (0-0.15) to bright colored values (0.65-0.85)
-            v = 0.65 + (v / 0.15) * 0.2  # Scale up significantly
-            s = min(s * 1.1, 1.0)  # Slightly boost saturation
-            new_r, new_g, new_b = self._hsv_to_rgb(h, s, v)
+            new_v = 0.65 + (v / 0.15) * 0.2  # Scale up significantly
+            new_s = min(s * 1.1, 1.0)  # Slightly boost saturation
+            new_r, new_g, new_b = self._adjust_value_saturation(r, g, b, v, diff, new_v, new_s)
             # Clamp values to 0-1 range
             return (min(max(new_r, 0), 1), min(max(new_g, 0), 1), min(max(new_b, 0), 1))
 
         # Dark colors (like dark blue) → brighten significantly
         if brightness < 0.4:
-            h, s, v = self._rgb_to_hsv(r, g, b)
-            v = 0.75 + (v - 0.15) * 0.8
-            s = s * 0.85
-            return self._hsv_to_rgb(h, s, v)
+            new_v = 0.75 + (v - 0.15) * 0.8
+            return self._adjust_value_saturation(r, g, b, v, diff, new_v, s * 0.85)
 
         # Medium-dark → brighten moderately
         if brightness < 0.6:
-            h, s, v = self._rgb_to_hsv(r, g, b)
-            v = 0.65 + (v - 0.4) * 1.0
-            s = s * 0.9
-            return self._hsv_to_rgb(h, s, v)
+            new_v = 0.65 + (v - 0.4) * 1.0
+            return self._adjust_value_saturation(r, g, b, v, diff, new_v, s * 0.9)
 
         # Other colors
-        h, s, v = self._rgb_to_hsv(r, g, b)
-        v = 0.5 + v * 0.5
-        return self._hsv_to_rgb(h, s, v)
+        new_v = 0.5 + v * 0.5
+        return self._adjust_value_saturation(r, g, b, v, diff, new_v, s)
+
+    def _adjust_value_saturation(self, r: float, g: float, b: float, v: float, diff: float,
+                                 new_v: float, new_s: float) -> Tuple[float, float, float]:
+        """
+        Set the HSV value and saturation of an RGB color while keeping its hue.
+
+        Equivalent to converting to HSV, replacing V and S, and converting back,
+        but computed directly on the RGB channels. In HSV each channel sits at
+        a fixed, hue-determined fraction between the smallest channel (V - C)
+        and the largest (V), where C = V * S is the chroma. The new color keeps
+        those fractions with the new V and C, which gives:
+
+            channel' = V' - V' * S' * (V - channel) / (max - min)
+
+        This avoids the two six-way hue sector branches of an HSV round-trip.
+
+        Args:
+            r (float): Red component (0.0 to 1.0)
+            g (float): Green component (0.0 to 1.0)
+            b (float): Blue component (0.0 to 1.0)
+            v (float): Current HSV value, max(r, g, b)
+            diff (float): Current chroma, max(r, g, b) - min(r, g, b)
+            new_v (float): New HSV value
+            new_s (float): New HSV saturation
+
+        Returns:
+            Tuple[float, float, float]: Adjusted (r, g, b) values
+
+        Example:
+            >>> # Dark blue, brightened to V=0.85 with saturation 0.8
+            >>> processor._adjust_value_saturation(0.0, 0.0, 0.5, 0.5, 0.5, 0.85, 0.8)
+            (0.17, 0.17, 0.85)  # approximate
+        """
+        # Gray: no hue to preserve, every channel becomes the new value
+        if diff == 0:
+            return new_v, new_v, new_v
+
+        scale = new_v * new_s / diff
+        return new_v - (v - r) * scale, new_v - (v - g) * scale, new_v - (v - b) * scale
 
     def _transform_grayscale(self, gray: float) -> float:
         """
@@ -626,10 +807,7 @@ class PDFVectorProcessorPikePDF:
             0.98  # Bright white
         """
         if gray > 0.93:
-            bg_gray = (0.299 * self.bg_color["r"] +
-                      0.587 * self.bg_color["g"] +
-                      0.114 * self.bg_color["b"]) / 255.0
-            return bg_gray
+            return self._bg_gray
 
         if gray < 0.15:
             return 0.98
@@ -696,10 +874,7 @@ class PDFVectorProcessorPikePDF:
         # Transform
         new_r, new_g, new_b = self._transform_rgb(r, g, b)
 
-        # Convert back to CMYK
-        if new_r == 0 and new_g == 0 and new_b == 0:
-            return 0, 0, 0, 1
-
+        # Convert back to CMYK (pure black falls through to the K-only branch)
         new_k = 1 - max(new_r, new_g, new_b)
         if new_k < 1:
             new_c = (1 - new_r - new_k) / (1 - new_k)
@@ -711,120 +886,3 @@ class PDFVectorProcessorPikePDF:
             new_y = 0
 
         return new_c, new_m, new_y, new_k
-
-    def _rgb_to_hsv(self, r: float, g: float, b: float) -> Tuple[float, float, float]:
-        """
-        Convert RGB color values to HSV (Hue, Saturation, Value) color space.
-
-        HSV is a cylindrical color space that separates chromatic content (hue and
-        saturation) from brightness (value). This makes it ideal for color
-        transformations that need to preserve hue while adjusting brightness.
-
-        Calculation:
-            1. Find max and min of R, G, B components
-            2. Hue (H): Based on which component is maximum
-               - If R is max: H = 60 * ((G - B) / diff)
-               - If G is max: H = 60 * ((B - R) / diff) + 120
-               - If B is max: H = 60 * ((R - G) / diff) + 240
-               - Normalized to 0-360 degrees, then scaled to 0-1
-            3. Saturation (S): diff / max (0 if max is 0)
-            4. Value (V): max component value
-
-        Args:
-            r (float): Red component (0.0 to 1.0)
-            g (float): Green component (0.0 to 1.0)
-            b (float): Blue component (0.0 to 1.0)
-
-        Returns:
-            Tuple[float, float, float]: (h, s, v) where:
-                - h (hue): 0.0-1.0 (0-360 degrees normalized)
-                - s (saturation): 0.0-1.0 (0% to 100%)
-                - v (value/brightness): 0.0-1.0 (0% to 100%)
-
-        Example:
-            >>> processor._rgb_to_hsv(1.0, 0.0, 0.0)  # Pure red
-            (0.0, 1.0, 1.0)  # H=0 (red), S=100%, V=100%
-
-            >>> processor._rgb_to_hsv(0.5, 0.5, 0.5)  # Gray
-            (0.0, 0.0, 0.5)  # H=0 (undefined), S=0%, V=50%
-        """
-        max_val = max(r, g, b)
-        min_val = min(r, g, b)
-        diff = max_val - min_val
-
-        if diff == 0:
-            h = 0
-        elif max_val == r:
-            h = (60 * ((g - b) / diff) + 360) % 360
-        elif max_val == g:
-            h = (60 * ((b - r) / diff) + 120) % 360
-        else:
-            h = (60 * ((r - g) / diff) + 240) % 360
-
-        s = 0 if max_val == 0 else (diff / max_val)
-        v = max_val
-
-        return h / 360.0, s, v
-
-    def _hsv_to_rgb(self, h: float, s: float, v: float) -> Tuple[float, float, float]:
-        """
-        Convert HSV (Hue, Saturation, Value) color values back to RGB color space.
-
-        This is the inverse operation of _rgb_to_hsv. It's used after manipulating
-        colors in HSV space (typically adjusting brightness while preserving hue)
-        to convert back to RGB for use in PDF color operators.
-
-        Calculation:
-            1. Convert normalized hue (0-1) back to degrees (0-360)
-            2. Calculate intermediate values:
-               - C (chroma): V * S
-               - X: C * (1 - |((H / 60) mod 2) - 1|)
-               - m (match): V - C
-            3. Determine R', G', B' based on hue sector (60-degree segments)
-            4. Add m to each component: R = R' + m, G = G' + m, B = B' + m
-
-        Hue Sectors:
-            0-60°: (C, X, 0) + m → Red to Yellow
-            60-120°: (X, C, 0) + m → Yellow to Green
-            120-180°: (0, C, X) + m → Green to Cyan
-            180-240°: (0, X, C) + m → Cyan to Blue
-            240-300°: (X, 0, C) + m → Blue to Magenta
-            300-360°: (C, 0, X) + m → Magenta to Red
-
-        Args:
-            h (float): Hue (0.0 to 1.0, representing 0-360 degrees)
-            s (float): Saturation (0.0 to 1.0, 0% to 100%)
-            v (float): Value/Brightness (0.0 to 1.0, 0% to 100%)
-
-        Returns:
-            Tuple[float, float, float]: (r, g, b) where each component is 0.0-1.0
-
-        Example:
-            >>> processor._hsv_to_rgb(0.0, 1.0, 1.0)  # Pure red in HSV
-            (1.0, 0.0, 0.0)  # Pure red in RGB
-
-            >>> processor._hsv_to_rgb(0.333, 1.0, 1.0)  # Green in HSV
-            (0.0, 1.0, 0.0)  # Green in RGB (approximate)
-
-            >>> processor._hsv_to_rgb(0.0, 0.0, 0.5)  # Gray in HSV
-            (0.5, 0.5, 0.5)  # Gray in RGB
-        """
-        h = h * 360.0
-        c = v * s
-        x = c * (1 - abs((h / 60) % 2 - 1))
-        m = v - c
-
-        if 0 <= h < 60:
-            r, g, b = c, x, 0
-        elif 60 <= h < 120:
-            r, g, b = x, c, 0
-        elif 120 <= h < 180:
-            r, g, b = 0, c, x
-        elif 180 <= h < 240:
-            r, g, b = 0, x, c
-        elif 240 <= h < 300:
-            r, g, b = x, 0, c
-        else:
-            r, g, b = c, 0, x
-
-        return r + m, g + m, b + m
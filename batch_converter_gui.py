@@ -40,6 +40,8 @@ from tkinter import ttk, filedialog, messagebox, scrolledtext
 import os
 import sys
 import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 # Add backend to path
@@ -47,6 +49,65 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 from pdf_processor_pikepdf import PDFVectorProcessorPikePDF
 
 
+def get_worker_count():
+    """
+    Return the number of worker processes used for batch conversion.
+
+    Reads the PDF_DARK_MODE_WORKERS environment variable so the pool can be
+    sized for the machine (e.g. lowered on memory-constrained hosts). Missing,
+    invalid, or non-positive values fall back to the number of CPU cores.
+
+    Returns:
+        int: Number of worker processes (at least 1)
+    """
+    try:
+        workers = int(os.environ.get("PDF_DARK_MODE_WORKERS", "0"))
+    except ValueError:
+        workers = 0
+
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+
+    # ProcessPoolExecutor rejects more than 61 workers on Windows
+    if sys.platform == "win32":
+        workers = min(workers, 61)
+
+    return workers
+
+
+# Processor owned by the current worker process, created once by init_worker()
+_worker_processor = None
+
+
+def init_worker(theme):
+    """
+    Initialize a conversion worker process.
+
+    Runs once in each worker of the conversion pool and builds the processor
+    used for every file that worker converts, so setup is paid per worker
+    rather than per file.
+
+    Args:
+        theme (str): Theme name passed to PDFVectorProcessorPikePDF
+    """
+    global _worker_processor
+    _worker_processor = PDFVectorProcessorPikePDF(theme=theme)
+
+
+def convert_pdf_file(pdf_path, output_path):
+    """
+    Convert a single PDF file to dark mode and write the result to disk.
+
+    This runs inside a worker process of the conversion pool, so it is a
+    module-level function (picklable) that uses the worker's processor.
+
+    Args:
+        pdf_path (str): Path of the source PDF
+        output_path (str): Path where the dark mode PDF is written
+    """
+    _worker_processor.process_pdf(pdf_path, output_path=output_path)
+
+
 class PDFBatchConverterGUI:
     """
     Main GUI application class for batch PDF dark mode conversion.
@@ -410,8 +471,8 @@ class PDFBatchConverterGUI:
         Request cancellation of the ongoing conversion process.
 
         Sets the is_converting flag to False, which is checked by convert_all_pdfs()
-        between file conversions. The cancellation is cooperative - the current file
-        will finish converting before the process stops.
+        between file conversions. The cancellation is cooperative - files already
+        being converted by a worker process will finish, queued files are dropped.
 
         Updates the UI:
         - Logs a cancellation message
@@ -444,8 +505,9 @@ class PDFBatchConverterGUI:
 
         3. Conversion Phase:
            - Creates necessary output directories
-           - Processes each PDF using PDFVectorProcessorPikePDF
-           - Updates progress bar and status label in real-time
+           - Queues each PDF on a pool of worker processes (one per CPU core),
+             which convert files in parallel using PDFVectorProcessorPikePDF
+           - Updates progress bar and status label in real-time as files finish
            - Logs detailed information for each file
 
         4. Dry Run Mode:
@@ -527,35 +589,61 @@ class PDFBatchConverterGUI:
 
             # Get theme
             theme = self.theme_var.get()
-            processor = None if dry_run else PDFVectorProcessorPikePDF(theme=theme)
-
-            # Convert each PDF
-            for i, (pdf_path, output_path) in enumerate(pdf_files):
-                if not self.is_converting:
-                    self.log("Conversion cancelled by user.")
-                    break
-
-                # Calculate relative path for display
-                rel_path = os.path.relpath(pdf_path, self.selected_folder)
-                rel_output = os.path.relpath(output_path, self.selected_folder)
-
-                # Create output subdirectories (even in dry run to test path logic)
-                if not dry_run:
-                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-                # Check if we need to convert (only if source is newer or output doesn't exist)
-                should_convert = True
-                if os.path.exists(output_path):
-                    source_mtime = os.path.getmtime(pdf_path)
-                    output_mtime = os.path.getmtime(output_path)
-                    if source_mtime <= output_mtime:
-                        should_convert = False
-                        self.skipped_count += 1
-                        if dry_run:
-                            self.log(f"[SKIP] {rel_path}")
-                            self.log(f"       -> {rel_output} (already up to date)")
-                        else:
-                            self.log(f"Skipping (up to date): {rel_path}")
+
+            # Conversions run in a pool of worker processes so several PDFs are
+            # converted in parallel (one per CPU core by default, override with
+            # PDF_DARK_MODE_WORKERS) instead of one at a time.
+            # Spawn is used on every platform to avoid forking the Tk process.
+            executor = None if dry_run else ProcessPoolExecutor(
+                max_workers=get_worker_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker, initargs=(theme,))
+            pending = {}
+
+            try:
+                # Queue each PDF (or simulate in dry run)
+                for i, (pdf_path, output_path) in enumerate(pdf_files):
+                    if not self.is_converting:
+                        break
+
+                    # Calculate relative path for display
+                    rel_path = os.path.relpath(pdf_path, self.selected_folder)
+                    rel_output = os.path.relpath(output_path, self.selected_folder)
+
+                    # Create output subdirectories (even in dry run to test path logic)
+                    if not dry_run:
+                        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+                    # Check if we need to convert (only if source is newer or output doesn't exist)
+                    should_convert = True
+                    if os.path.exists(output_path):
+                        source_mtime = os.path.getmtime(pdf_path)
+                        output_mtime = os.path.getmtime(output_path)
+                        if source_mtime <= output_mtime:
+                            should_convert = False
+                            self.skipped_count += 1
+                            if dry_run:
+                                self.log(f"[SKIP] {rel_path}")
+                                self.log(f"       -> {rel_output} (already up to date)")
+                            else:
+                                self.log(f"Skipping (up to date): {rel_path}")
+                            self.processed_files += 1
+                            progress = (self.processed_files / self.total_files) * 100
+                            self.progress_var.set(progress)
+                            self.status_label.config(
+                                text=f"Processing {self.processed_files}/{self.total_files}",
+                                foreground="green"
+                            )
+
+                    if not should_convert:
+                        continue
+
+                    if dry_run:
+                        # Dry run - just show what would happen
+                        self.log(f"[WOULD CONVERT] {rel_path}")
+                        self.log(f"                -> {rel_output}")
+
+                        self.converted_count += 1
                         self.processed_files += 1
                         progress = (self.processed_files / self.total_files) * 100
                         self.progress_var.set(progress)
@@ -563,27 +651,22 @@ class PDFBatchConverterGUI:
                             text=f"Processing {self.processed_files}/{self.total_files}",
                             foreground="green"
                         )
-
-                # Convert (or simulate in dry run)
-                if should_convert:
+                    else:
+                        # Actually convert (in a worker process)
+                        self.log(f"Queued: {rel_path}")
+                        future = executor.submit(convert_pdf_file, pdf_path,
+                                                 output_path)
+                        pending[future] = (rel_path, rel_output)
+
+                # Collect conversion results as the workers finish
+                for future in as_completed(pending):
+                    if not self.is_converting:
+                        break
+
+                    rel_path, rel_output = pending[future]
                     try:
-                        if dry_run:
-                            # Dry run - just show what would happen
-                            self.log(f"[WOULD CONVERT] {rel_path}")
-                            self.log(f"                -> {rel_output}")
-                        else:
-                            # Actually convert
-                            self.log(f"Converting: {rel_path}")
-
-                            with open(pdf_path, 'rb') as f:
-                                input_bytes = f.read()
-
-                            output_bytes = processor.process_pdf(input_bytes)
-
-                            with open(output_path, 'wb') as f:
-                                f.write(output_bytes)
-
-                            self.log(f"  ✓ Saved to: {rel_output}")
+                        future.result()
+                        self.log(f"  ✓ Converted: {rel_path} -> {rel_output}")
 
                         self.converted_count += 1
                         self.processed_files += 1
@@ -595,7 +678,15 @@ class PDFBatchConverterGUI:
                         )
 
                     except Exception as e:
-                        self.log(f"  ✗ ERROR: {str(e)}")
+                        self.log(f"  ✗ ERROR: {rel_path}: {str(e)}")
+
+            finally:
+                if executor is not None:
+                    # Drop queued files on cancel; files already converting finish
+                    executor.shutdown(wait=True, cancel_futures=True)
+
+            if not self.is_converting:
+                self.log("Conversion cancelled by user.")
 
             # Done
             if self.is_converting: